@@ -16,11 +16,27 @@ def main(argv: list[str] | None = None) -> int:
     """Parse arguments and run import."""
     parser = argparse.ArgumentParser(description="everstox Shopify connector")
     parser.add_argument("--dry-run", action="store_true", help="Run without sending requests")
+    parser.add_argument("--snapshot", help="Path of the columnar order snapshot (.npz) to write or read")
+    parser.add_argument(
+        "--from-snapshot",
+        action="store_true",
+        help="Re-filter orders from the snapshot instead of fetching from Shopify",
+    )
+    parser.add_argument("--tag-whitelist", help="Override TAG_WHITELIST (comma-separated)")
+    parser.add_argument("--tag-blacklist", help="Override TAG_BLACKLIST (comma-separated)")
     args = parser.parse_args(argv)
 
     settings = load_settings()
     if args.dry_run:
         settings.dry_run = True
+    if args.snapshot:
+        settings.snapshot_path = args.snapshot
+    if args.from_snapshot:
+        settings.from_snapshot = True
+    if args.tag_whitelist is not None:
+        settings.tag_whitelist = args.tag_whitelist
+    if args.tag_blacklist is not None:
+        settings.tag_blacklist = args.tag_blacklist
 
     result = import_orders(settings)
 
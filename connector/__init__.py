@@ -6,6 +6,7 @@ __all__ = [
     "config",
     "shopify_client",
     "shopify_queries",
+    "snapshot",
     "tags",
     "transform",
     "dry_run",
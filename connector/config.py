@@ -24,6 +24,8 @@ class Settings:
     tag_whitelist: Optional[str] = None
     tag_blacklist: Optional[str] = None
     dry_run: bool = True
+    snapshot_path: Optional[str] = None
+    from_snapshot: bool = False
 
 
 def load_settings() -> Settings:
@@ -40,4 +42,5 @@ def load_settings() -> Settings:
         tag_whitelist=os.getenv("TAG_WHITELIST"),
         tag_blacklist=os.getenv("TAG_BLACKLIST"),
         dry_run=os.getenv("DRY_RUN", "true").lower() == "true",
+        snapshot_path=os.getenv("ORDER_SNAPSHOT_PATH"),
     )
@@ -4,26 +4,42 @@ Import orchestration: fetch, filter, transform, summarize.
 
 from __future__ import annotations
 
-from typing import Any, Dict, Iterable, List, Tuple
+from typing import Any, Dict
+
+import numpy as np
 
 from .config import Settings
 from .dry_run import build_request
 from .shopify_client import ShopifyClient
-from .tags import is_excluded, parse_order_priority
+from .snapshot import REASONS, OrderSnapshot
 from .transform import to_everstox_payload
 
 
 def import_orders(settings: Settings) -> Dict[str, Any]:
     """
-    Orchestrate import flow (dry-run): fetch -> filter -> transform -> build request.
+    Orchestrate import flow (dry-run): fetch -> snapshot -> filter -> transform -> build request.
+
+    With `settings.from_snapshot`, orders are read from `settings.snapshot_path`
+    instead of Shopify so filter changes can be re-evaluated without refetching.
     """
     whitelist = [w.strip() for w in (settings.tag_whitelist or "").split(",") if w.strip()]
     blacklist = [b.strip() for b in (settings.tag_blacklist or "").split(",") if b.strip()]
 
-    with ShopifyClient(settings.shopify_store, settings.shopify_token) as client:
-        fetched_orders = client.fetch_recent_orders(14)
-
-    included, excluded = _filter_orders(fetched_orders, whitelist, blacklist)
+    if settings.from_snapshot:
+        if not settings.snapshot_path:
+            raise RuntimeError("from_snapshot requires ORDER_SNAPSHOT_PATH / --snapshot")
+        snapshot = OrderSnapshot.load(settings.snapshot_path)
+    else:
+        with ShopifyClient(settings.shopify_store, settings.shopify_token) as client:
+            fetched_orders = client.fetch_recent_orders(14)
+        snapshot = OrderSnapshot.from_orders(fetched_orders)
+        if settings.snapshot_path:
+            snapshot.save(settings.snapshot_path)
+
+    # Rules run column-wise over the snapshot; only eligible rows become dicts again.
+    codes = snapshot.exclusion_codes(whitelist, blacklist)
+    excluded_rows = np.flatnonzero(codes)
+    included = snapshot.materialize(np.flatnonzero(codes == 0))
 
     shop_instance_id = settings.everstox_shop_id or "SHOP_INSTANCE_UUID"
     payload = to_everstox_payload(included, shop_instance_id=shop_instance_id)
@@ -31,10 +47,14 @@ def import_orders(settings: Settings) -> Dict[str, Any]:
 
     prepared_request = build_request(settings.everstox_shop_id or "", payload)
 
-    summary = _summarize(excluded, included)
+    summary = _summarize(codes)
     excluded_sample = [
-        {"id": o.get("id"), "name": o.get("name"), "reason": o.get("exclude_reason")}
-        for o in excluded[:5]
+        {
+            "id": str(snapshot.ids[row]) or None,
+            "name": str(snapshot.names[row]) or None,
+            "reason": REASONS[codes[row]],
+        }
+        for row in excluded_rows[:5]
     ]
 
     return {
@@ -44,85 +64,19 @@ def import_orders(settings: Settings) -> Dict[str, Any]:
     }
 
 
-def _filter_orders(
-    orders: Iterable[Dict[str, Any]],
-    whitelist: List[str],
-    blacklist: List[str],
-) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
-    """
-    Filter orders and attach derived fields; return (included, excluded).
-
-    Rules:
-    - Exclude if not paid
-    - Exclude if fully fulfilled
-    - Exclude if excluded by tag rules
-    - Exclude if no remaining quantities on any line item (defensive)
-    """
-    included: List[Dict[str, Any]] = []
-    excluded: List[Dict[str, Any]] = []
-
-    for order in orders:
-        tags = order.get("tags") or []
-        reason: str | None = None
-
-        if order.get("displayFinancialStatus") != "PAID":
-            reason = "not_paid"
-        elif order.get("displayFulfillmentStatus") == "FULFILLED":
-            reason = "fulfilled"
-        elif is_excluded(tags, whitelist, blacklist):
-            reason = "tag_excluded"
-
-        priority = parse_order_priority(tags)
-
-        # Compute remaining quantities (include partial fulfillment)
-        remaining_items: List[Dict[str, Any]] = []
-        line_items = (order.get("lineItems") or {}).get("nodes", [])
-        for item in line_items:
-            qty = item.get("quantity") or 0
-            
-            status = (item.get("fulfillmentStatus") or "").upper()
-            # If Shopify says a line is fulfilled, skip it; otherwise import full quantity
-            if status == "FULFILLED":
-                continue
-            remaining_qty = qty
-
-            if remaining_qty > 0:
-                item_with_remaining = dict(item)
-                item_with_remaining["remaining_qty"] = remaining_qty
-                remaining_items.append(item_with_remaining)
-
-        # Defensive exclusion: avoids building payloads with empty line items
-        if reason is None and not remaining_items:
-            reason = "no_remaining_items"
-
-        if reason:
-            marked = dict(order)
-            marked["exclude_reason"] = reason
-            marked["order_priority"] = priority
-            excluded.append(marked)
-            continue
-
-        enriched = dict(order)
-        enriched["order_priority"] = priority
-        enriched["remaining_line_items"] = remaining_items
-        included.append(enriched)
-
-    return included, excluded
-
-
-def _summarize(excluded: List[Dict[str, Any]], included: List[Dict[str, Any]]) -> Dict[str, Any]:
+def _summarize(codes: np.ndarray) -> Dict[str, Any]:
     """
     Summarize import results with simple counts and exclusion reasons.
     """
+    counts = np.bincount(codes, minlength=len(REASONS))
     summary: Dict[str, Any] = {}
-    summary["fetched_total"] = len(excluded) + len(included)
-    summary["eligible_total"] = len(included)
-    summary["excluded_total"] = len(excluded)
-
-    reason_counts: Dict[str, int] = {}
-    for order in excluded:
-        reason = order.get("exclude_reason") or "unknown"
-        reason_counts[reason] = reason_counts.get(reason, 0) + 1
+    summary["fetched_total"] = int(len(codes))
+    summary["eligible_total"] = int(counts[0])
+    summary["excluded_total"] = int(len(codes) - counts[0])
+
+    reason_counts: Dict[str, int] = {
+        REASONS[code]: int(count) for code, count in enumerate(counts) if code and count
+    }
     if reason_counts:
         summary["exclusion_reasons"] = reason_counts
 
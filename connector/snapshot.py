@@ -0,0 +1,246 @@
+"""
+Columnar snapshot of fetched Shopify orders with vectorized filtering.
+
+Orders are stored as NumPy columns so that filter rules (eligibility, tag
+whitelist/blacklist, remaining quantities) can be re-evaluated without
+refetching from Shopify. Only orders that pass are decoded back into dicts.
+"""
+
+from __future__ import annotations
+
+import json
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Sequence
+
+import numpy as np
+
+from .tags import normalize_rules, normalize_tags, parse_order_priority
+
+SNAPSHOT_VERSION = 1
+
+# Exclusion reason codes; index 0 means the order is eligible.
+REASONS = ("", "not_paid", "fulfilled", "tag_excluded", "no_remaining_items")
+INCLUDED = 0
+NOT_PAID = 1
+FULFILLED = 2
+TAG_EXCLUDED = 3
+NO_REMAINING_ITEMS = 4
+
+
+class OrderSnapshot:
+    """
+    Column store for fetched orders.
+
+    Per order: id, name, status fields, createdAt and the raw order JSON.
+    Tags and line items are flattened with offsets into per-order ranges;
+    tags are dictionary-encoded against a vocabulary of normalized tags.
+    """
+
+    def __init__(self, columns: Dict[str, np.ndarray]) -> None:
+        self.ids = columns["ids"]
+        self.names = columns["names"]
+        self.financial_status = columns["financial_status"]
+        self.fulfillment_status = columns["fulfillment_status"]
+        self.created_at = columns["created_at"]
+        self.tag_vocab = columns["tag_vocab"]
+        self.tag_codes = columns["tag_codes"]
+        self.tag_offsets = columns["tag_offsets"]
+        self.item_qty = columns["item_qty"]
+        self.item_fulfilled = columns["item_fulfilled"]
+        self.item_offsets = columns["item_offsets"]
+        self.raw = columns["raw"]
+        self.raw_offsets = columns["raw_offsets"]
+
+        # Row index of the owning order for every flattened tag / line item.
+        rows = np.arange(len(self.ids))
+        self._tag_rows = np.repeat(rows, np.diff(self.tag_offsets))
+        self._item_rows = np.repeat(rows, np.diff(self.item_offsets))
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @classmethod
+    def from_orders(cls, orders: Iterable[Dict[str, Any]]) -> "OrderSnapshot":
+        """
+        Build a snapshot from Shopify order dicts as returned by the client.
+        """
+        ids: List[str] = []
+        names: List[str] = []
+        financial: List[str] = []
+        fulfillment: List[str] = []
+        created: List[np.datetime64] = []
+        vocab: Dict[str, int] = {}
+        tag_codes: List[int] = []
+        tag_offsets: List[int] = [0]
+        item_qty: List[float] = []
+        item_fulfilled: List[bool] = []
+        item_offsets: List[int] = [0]
+        raw_parts: List[bytes] = []
+        raw_offsets: List[int] = [0]
+
+        for order in orders:
+            ids.append(order.get("id") or "")
+            names.append(order.get("name") or "")
+            financial.append(order.get("displayFinancialStatus") or "")
+            fulfillment.append(order.get("displayFulfillmentStatus") or "")
+            created.append(_parse_created_at(order.get("createdAt")))
+
+            for tag in normalize_tags(order.get("tags") or []):
+                tag_codes.append(vocab.setdefault(tag, len(vocab)))
+            tag_offsets.append(len(tag_codes))
+
+            for item in (order.get("lineItems") or {}).get("nodes", []):
+                item_qty.append(item.get("quantity") or 0)
+                item_fulfilled.append((item.get("fulfillmentStatus") or "").upper() == "FULFILLED")
+            item_offsets.append(len(item_qty))
+
+            encoded = json.dumps(order, separators=(",", ":")).encode("utf-8")
+            raw_parts.append(encoded)
+            raw_offsets.append(raw_offsets[-1] + len(encoded))
+
+        columns = {
+            "ids": _str_column(ids),
+            "names": _str_column(names),
+            "financial_status": _str_column(financial),
+            "fulfillment_status": _str_column(fulfillment),
+            "created_at": np.array(created, dtype="datetime64[s]"),
+            "tag_vocab": _str_column(list(vocab)),
+            "tag_codes": np.array(tag_codes, dtype=np.int32),
+            "tag_offsets": np.array(tag_offsets, dtype=np.int64),
+            # Float so non-integer quantities keep their sign for the `> 0` check.
+            "item_qty": np.array(item_qty, dtype=np.float64),
+            "item_fulfilled": np.array(item_fulfilled, dtype=bool),
+            "item_offsets": np.array(item_offsets, dtype=np.int64),
+            "raw": np.frombuffer(b"".join(raw_parts), dtype=np.uint8),
+            "raw_offsets": np.array(raw_offsets, dtype=np.int64),
+        }
+        return cls(columns)
+
+    @classmethod
+    def load(cls, path: str) -> "OrderSnapshot":
+        """
+        Load a snapshot previously written with `save`.
+        """
+        with np.load(path) as data:
+            version = int(data["version"])
+            if version != SNAPSHOT_VERSION:
+                raise RuntimeError(f"Unsupported order snapshot version {version} in {path}")
+            columns = {key: data[key] for key in data.files if key != "version"}
+        return cls(columns)
+
+    def save(self, path: str) -> None:
+        """
+        Write the snapshot as an uncompressed .npz archive (no pickled objects).
+        """
+        # Write through a handle so np.savez does not append ".npz" to `path`.
+        with open(path, "wb") as fh:
+            np.savez(
+                fh,
+                version=np.array(SNAPSHOT_VERSION),
+                ids=self.ids,
+                names=self.names,
+                financial_status=self.financial_status,
+                fulfillment_status=self.fulfillment_status,
+                created_at=self.created_at,
+                tag_vocab=self.tag_vocab,
+                tag_codes=self.tag_codes,
+                tag_offsets=self.tag_offsets,
+                item_qty=self.item_qty,
+                item_fulfilled=self.item_fulfilled,
+                item_offsets=self.item_offsets,
+                raw=self.raw,
+                raw_offsets=self.raw_offsets,
+            )
+
+    def exclusion_codes(self, whitelist: List[str], blacklist: List[str]) -> np.ndarray:
+        """
+        Return one reason code per order (see REASONS); 0 means eligible.
+
+        Tag rules follow `tags.is_excluded`; rules apply in this precedence:
+        not paid, fully fulfilled, tag rules, then no remaining quantities.
+        """
+        not_paid = self.financial_status != "PAID"
+        fulfilled = self.fulfillment_status == "FULFILLED"
+        tag_excluded = self._tag_excluded(whitelist, blacklist)
+        no_remaining = ~self._has_remaining_items()
+
+        return np.select(
+            [not_paid, fulfilled, tag_excluded, no_remaining],
+            [NOT_PAID, FULFILLED, TAG_EXCLUDED, NO_REMAINING_ITEMS],
+            default=INCLUDED,
+        ).astype(np.int8)
+
+    def materialize(self, rows: Sequence[int]) -> List[Dict[str, Any]]:
+        """
+        Decode the given rows into order dicts with derived fields attached
+        (`order_priority`, `remaining_line_items`), ready for `transform_order`.
+        """
+        remaining = self._remaining_item_mask()
+        orders: List[Dict[str, Any]] = []
+        for row in rows:
+            order = json.loads(self.raw[self.raw_offsets[row] : self.raw_offsets[row + 1]].tobytes())
+            start = self.item_offsets[row]
+            line_items = (order.get("lineItems") or {}).get("nodes", [])
+            remaining_items: List[Dict[str, Any]] = []
+            for offset, item in enumerate(line_items):
+                if remaining[start + offset]:
+                    item_with_remaining = dict(item)
+                    # Pass the original value through; transform_order validates it.
+                    item_with_remaining["remaining_qty"] = item.get("quantity") or 0
+                    remaining_items.append(item_with_remaining)
+
+            order["order_priority"] = parse_order_priority(order.get("tags") or [])
+            order["remaining_line_items"] = remaining_items
+            orders.append(order)
+        return orders
+
+    def _tag_excluded(self, whitelist: List[str], blacklist: List[str]) -> np.ndarray:
+        """
+        Same semantics as `tags.is_excluded`, but rules are matched against the
+        distinct-tag vocabulary and the result is broadcast to orders.
+        """
+        normalized_whitelist = normalize_rules(whitelist)
+        excluded = self._orders_with_tag(self._vocab_matches(normalize_rules(blacklist)))
+        if normalized_whitelist:
+            excluded |= ~self._orders_with_tag(self._vocab_matches(normalized_whitelist))
+        return excluded
+
+    def _vocab_matches(self, normalized_rules: List[str]) -> np.ndarray:
+        # Vectorized equivalent of `tags.tag_matches_any` (substring `rule in tag`).
+        matched = np.zeros(len(self.tag_vocab), dtype=bool)
+        for rule in normalized_rules:
+            matched |= np.char.find(self.tag_vocab, rule) >= 0
+        return matched
+
+    def _orders_with_tag(self, vocab_mask: np.ndarray) -> np.ndarray:
+        hits = vocab_mask[self.tag_codes]
+        return np.bincount(self._tag_rows[hits], minlength=len(self)) > 0
+
+    def _remaining_item_mask(self) -> np.ndarray:
+        # Fulfilled lines are skipped; otherwise the full quantity is importable.
+        return ~self.item_fulfilled & (self.item_qty > 0)
+
+    def _has_remaining_items(self) -> np.ndarray:
+        mask = self._remaining_item_mask()
+        return np.bincount(self._item_rows[mask], minlength=len(self)) > 0
+
+
+def _str_column(values: List[str]) -> np.ndarray:
+    # Fixed-width unicode keeps the column pickle-free and usable with np.char.
+    return np.array(values, dtype=str) if values else np.array([], dtype="U1")
+
+
+def _parse_created_at(value: Any) -> np.datetime64:
+    """
+    Parse an ISO timestamp into naive UTC; missing or unparsable values become NaT.
+    """
+    if not isinstance(value, str):
+        return np.datetime64("NaT", "s")
+    try:
+        # fromisoformat only accepts a trailing "Z" from Python 3.11 on.
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        if parsed.tzinfo is not None:
+            parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    except (ValueError, OverflowError):
+        return np.datetime64("NaT", "s")
+    return np.datetime64(parsed, "s")
@@ -33,23 +33,40 @@ def parse_order_priority(tags: Iterable[str]) -> Optional[int]:
     return max(1, min(priority, 100))
 
 
+def normalize_tags(tags: Iterable[str]) -> List[str]:
+    """
+    Strip and lowercase tags, dropping missing ones.
+    """
+    return [t.strip().lower() for t in tags if t is not None]
+
+
+def normalize_rules(rules: Iterable[str]) -> List[str]:
+    """
+    Strip and lowercase whitelist/blacklist rules, dropping empty ones.
+    """
+    return [r.strip().lower() for r in rules if r]
+
+
+def tag_matches_any(tag: str, normalized_rules: List[str]) -> bool:
+    """
+    Return True if a normalized tag contains any normalized rule as a substring.
+    """
+    return any(rule in tag for rule in normalized_rules)
+
+
 def is_excluded(tags: Iterable[str], whitelist: List[str], blacklist: List[str]) -> bool:
     """
     Apply blacklist/whitelist semantics; blacklist wins, whitelist requires a match when provided.
     """
-    normalized_tags = [t.strip().lower() for t in tags if t is not None]
-    normalized_whitelist = [w.strip().lower() for w in whitelist if w]
-    normalized_blacklist = [b.strip().lower() for b in blacklist if b]
-
-    def matches(rule: str) -> bool:
-        return any(rule in tag for tag in normalized_tags)
+    normalized_tags = normalize_tags(tags)
+    normalized_whitelist = normalize_rules(whitelist)
+    normalized_blacklist = normalize_rules(blacklist)
 
-    for rule in normalized_blacklist:
-        if matches(rule):
-            return True
+    if any(tag_matches_any(tag, normalized_blacklist) for tag in normalized_tags):
+        return True
 
     if normalized_whitelist:
-        if not any(matches(rule) for rule in normalized_whitelist):
+        if not any(tag_matches_any(tag, normalized_whitelist) for tag in normalized_tags):
             return True
 
     return False
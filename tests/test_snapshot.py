@@ -0,0 +1,166 @@
+"""
+Tests for the columnar order snapshot against the row-wise filter rules.
+"""
+
+from __future__ import annotations
+
+import random
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+import pytest
+
+from connector.snapshot import REASONS, TAG_EXCLUDED, OrderSnapshot
+from connector.tags import is_excluded, parse_order_priority
+
+RULE_SETS = [
+    ([], []),
+    (["vip"], []),
+    ([], ["hold", "test"]),
+    (["p", "urgent"], ["b2b"]),
+    (["größe"], ["VIP "]),
+    ([" "], []),
+]
+
+
+def _row_wise_filter(
+    orders: List[Dict[str, Any]], whitelist: List[str], blacklist: List[str]
+) -> Tuple[List[Dict[str, Any]], List[str]]:
+    """
+    Reference implementation: the per-order loop the snapshot replaces.
+    Returns (included orders, exclusion reasons in order).
+    """
+    included: List[Dict[str, Any]] = []
+    reasons: List[str] = []
+    for order in orders:
+        tags = order.get("tags") or []
+        reason = None
+        if order.get("displayFinancialStatus") != "PAID":
+            reason = "not_paid"
+        elif order.get("displayFulfillmentStatus") == "FULFILLED":
+            reason = "fulfilled"
+        elif is_excluded(tags, whitelist, blacklist):
+            reason = "tag_excluded"
+
+        remaining_items = []
+        for item in (order.get("lineItems") or {}).get("nodes", []):
+            qty = item.get("quantity") or 0
+            if (item.get("fulfillmentStatus") or "").upper() == "FULFILLED":
+                continue
+            if qty > 0:
+                remaining_items.append(dict(item, remaining_qty=qty))
+
+        if reason is None and not remaining_items:
+            reason = "no_remaining_items"
+
+        if reason:
+            reasons.append(reason)
+            continue
+        enriched = dict(order)
+        enriched["order_priority"] = parse_order_priority(tags)
+        enriched["remaining_line_items"] = remaining_items
+        included.append(enriched)
+    return included, reasons
+
+
+def _random_orders(count: int, seed: int = 7) -> List[Dict[str, Any]]:
+    rng = random.Random(seed)
+    tag_pool = ["VIP", " urgent ", "prio:5", "Größe L", "B2B", "test", None, "p 40", "Hold", "wholesale"]
+    orders = []
+    for i in range(count):
+        line_items = None
+        if i % 11:
+            line_items = {
+                "nodes": [
+                    {
+                        "sku": f"SKU-{rng.randint(1, 5)}",
+                        "quantity": rng.choice([0, 1, 3, None, 0.5, 1.5]),
+                        "fulfillmentStatus": rng.choice(["FULFILLED", "Fulfilled", "unfulfilled", None]),
+                    }
+                    for _ in range(rng.randint(0, 3))
+                ]
+            }
+        orders.append(
+            {
+                "id": f"gid://shopify/Order/{i}",
+                "name": f"#{1000 + i}",
+                "createdAt": rng.choice(["2026-10-01T10:00:00Z", "2026-10-01T10:00:00+02:00", "garbage", None]),
+                "displayFinancialStatus": rng.choice(["PAID", "PAID", "PENDING", None]),
+                "displayFulfillmentStatus": rng.choice(["UNFULFILLED", "FULFILLED", "PARTIALLY_FULFILLED", None]),
+                "tags": rng.sample(tag_pool, rng.randint(0, 3)) if i % 7 else None,
+                "lineItems": line_items,
+            }
+        )
+    return orders
+
+
+def _assert_matches_row_wise(snapshot: OrderSnapshot, orders: List[Dict[str, Any]]) -> None:
+    for whitelist, blacklist in RULE_SETS:
+        expected_included, expected_reasons = _row_wise_filter(orders, whitelist, blacklist)
+        codes = snapshot.exclusion_codes(whitelist, blacklist)
+        assert [REASONS[code] for code in codes if code] == expected_reasons
+        assert snapshot.materialize(np.flatnonzero(codes == 0)) == expected_included
+
+
+def test_matches_row_wise_filter():
+    orders = _random_orders(3000)
+    _assert_matches_row_wise(OrderSnapshot.from_orders(orders), orders)
+
+
+def test_save_load_round_trip(tmp_path):
+    orders = _random_orders(500)
+    path = tmp_path / "orders.snap"
+    OrderSnapshot.from_orders(orders).save(str(path))
+
+    loaded = OrderSnapshot.load(str(path))
+
+    assert len(loaded) == len(orders)
+    _assert_matches_row_wise(loaded, orders)
+
+
+def test_created_at_is_normalized_to_utc():
+    snapshot = OrderSnapshot.from_orders(
+        [
+            {"createdAt": "2026-10-01T10:00:00+02:00"},
+            {"createdAt": "garbage"},
+            {"createdAt": "0001-01-01T00:30:00+01:00"},
+            {},
+        ]
+    )
+
+    assert snapshot.created_at[0] == np.datetime64("2026-10-01T08:00:00")
+    assert np.isnat(snapshot.created_at[1:]).all()
+
+
+def test_high_cardinality_tag_vocabulary():
+    # Per-order tags make the vocabulary roughly as large as the order count.
+    orders = [
+        {
+            "id": str(i),
+            "displayFinancialStatus": "PAID",
+            "tags": [f"Customer-{i}", "VIP" if i % 3 else f"hold-{i}"],
+            "lineItems": {"nodes": [{"quantity": 1}]},
+        }
+        for i in range(10000)
+    ]
+    snapshot = OrderSnapshot.from_orders(orders)
+
+    assert len(snapshot.tag_vocab) > len(orders)
+    _assert_matches_row_wise(snapshot, orders)
+    for whitelist, blacklist in [(["customer-1"], ["hold", "99"]), ([], ["customer-12"])]:
+        codes = snapshot.exclusion_codes(whitelist, blacklist)
+        expected = [is_excluded(o["tags"], whitelist, blacklist) for o in orders]
+        assert (codes == TAG_EXCLUDED).tolist() == expected
+
+
+@pytest.mark.parametrize("whitelist,blacklist", RULE_SETS)
+def test_empty_snapshot(tmp_path, whitelist, blacklist):
+    path = tmp_path / "empty"
+    OrderSnapshot.from_orders([]).save(str(path))
+    snapshot = OrderSnapshot.load(str(path))
+
+    codes = snapshot.exclusion_codes(whitelist, blacklist)
+
+    assert len(snapshot) == 0
+    assert codes.shape == (0,)
+    assert snapshot.materialize(np.flatnonzero(codes == 0)) == []